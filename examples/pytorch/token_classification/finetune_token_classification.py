@@ -1,5 +1,9 @@
+import os
 from dataclasses import dataclass, field
 
+import numpy as np
+from torch import distributed as dist
+
 from modelscope.metainfo import Trainers
 from modelscope.msdatasets import MsDataset
 from modelscope.trainers import build_trainer
@@ -41,9 +45,18 @@ class TokenClassificationArguments(TrainingArgs):
     def __call__(self, config):
         config = super().__call__(config)
         if config.safe_get('dataset.train.label') == 'ner_tags':
-            ner_tags_labels = train_dataset['ner_tags'] + eval_dataset[
-                'ner_tags']
-            label_enumerate_values = self._get_label_list(ner_tags_labels)
+            # Scan the label columns once on rank 0 and broadcast the
+            # result, instead of every rank repeating the work.
+            if dist.is_available() and dist.is_initialized():
+                broadcast_list = [None]
+                if dist.get_rank() == 0:
+                    broadcast_list[0] = self._get_label_list(
+                        train_dataset['ner_tags'], eval_dataset['ner_tags'])
+                dist.broadcast_object_list(broadcast_list, src=0)
+                label_enumerate_values = broadcast_list[0]
+            else:
+                label_enumerate_values = self._get_label_list(
+                    train_dataset['ner_tags'], eval_dataset['ner_tags'])
             config.merge_from_dict(
                 {'dataset.train.labels': label_enumerate_values})
         if config.train.lr_scheduler.type == 'LinearLR':
@@ -51,31 +64,31 @@ class TokenClassificationArguments(TrainingArgs):
                 int(len(train_dataset) / self.per_device_train_batch_size) * self.max_epochs
         return config
 
-    # TODO: Future performance optimization in MsDataset
     @staticmethod
-    def _get_label_list(labels):
+    def _get_label_list(*label_columns):
         unique_labels = set()
-        for label in labels:
-            unique_labels = unique_labels | set(label)
-        label_list = list(unique_labels)
-        label_list.sort()
-        return label_list
+        for labels in label_columns:
+            # Skip empty rows: np.asarray([]) is float64 and would
+            # promote an integer label column to float on concatenate.
+            label_arrays = [
+                np.asarray(label) for label in labels if len(label)
+            ]
+            if not label_arrays:
+                continue
+            flat_labels = np.concatenate(label_arrays)
+            unique_labels.update(np.unique(flat_labels).tolist())
+        return sorted(unique_labels)
 
 
 args = TokenClassificationArguments.from_cli(task='token-classification')
-print(args)
+if int(os.environ.get('RANK', '0')) == 0:
+    print(args)
 
-# load dataset
-train_dataset = MsDataset.load(
-    args.dataset_name,
-    subset_name=args.subset_name,
-    split='train',
-    namespace='damo')['train']
-eval_dataset = MsDataset.load(
-    args.dataset_name,
-    subset_name=args.subset_name,
-    split='validation',
-    namespace='damo')['validation']
+# load both splits in one pass instead of fetching the dataset twice
+dataset = MsDataset.load(
+    args.dataset_name, subset_name=args.subset_name, namespace='damo')
+train_dataset = dataset['train']
+eval_dataset = dataset['validation']
 
 kwargs = dict(
     model=args.model,
@@ -1,6 +1,8 @@
 # The implementation here is modified based on EfficientNet,
 # originally Apache 2.0 License and publicly available at https://github.com/lukemelas/EfficientNet-PyTorch
 
+from dataclasses import replace
+
 import torch
 from torch import nn
 from torch.nn import functional as F
@@ -122,8 +124,8 @@ class EfficientNet(nn.Module):
     """EfficientNet model.
        Most easily loaded with the .from_name or .from_pretrained methods.
     Args:
-        blocks_args (list[namedtuple]): A list of BlockArgs to construct blocks.
-        global_params (namedtuple): A set of GlobalParams shared between blocks.
+        blocks_args (list[BlockArgs]): A list of BlockArgs to construct blocks.
+        global_params (GlobalParams): A set of GlobalParams shared between blocks.
     References:
         [1] https://arxiv.org/abs/1905.11946 (EfficientNet)
     Example:
@@ -139,6 +141,11 @@ class EfficientNet(nn.Module):
         super().__init__()
         assert isinstance(blocks_args, list), 'blocks_args should be a list'
         assert len(blocks_args) > 0, 'block args must be greater than 0'
+        # Checked once here so drop_connect stays assert-free in the
+        # per-layer forward path (and keeps its semantics under -O).
+        drop_connect_rate = global_params.drop_connect_rate
+        if drop_connect_rate is not None and not 0 <= drop_connect_rate <= 1:
+            raise ValueError('drop_connect_rate must be in range of [0,1]')
         self._global_params = global_params
         self._blocks_args = blocks_args
 
@@ -158,7 +165,8 @@ class EfficientNet(nn.Module):
         self._blocks = nn.ModuleList([])
         for block_args in self._blocks_args:
 
-            block_args = block_args._replace(
+            block_args = replace(
+                block_args,
                 input_filters=round_filters(block_args.input_filters,
                                             self._global_params),
                 output_filters=round_filters(block_args.output_filters,
@@ -172,8 +180,10 @@ class EfficientNet(nn.Module):
             image_size = calculate_output_image_size(image_size,
                                                      block_args.stride)
             if block_args.num_repeat > 1:
-                block_args = block_args._replace(
-                    input_filters=block_args.output_filters, stride=1)
+                block_args = replace(
+                    block_args,
+                    input_filters=block_args.output_filters,
+                    stride=1)
             for _ in range(block_args.num_repeat - 1):
                 self._blocks.append(
                     MBConvBlock(
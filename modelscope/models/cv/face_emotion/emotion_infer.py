@@ -38,7 +38,10 @@ def inference(image, model, face_model, score_thre=0.5, GPU=0):
     face = face.unsqueeze(0)
     if torch.cuda.is_available():
         face = face.cuda(GPU)
-    logits_AU, logits_emotion = model(face)
+    # fp16 autocast halves bandwidth on the conv/BN-bound backbone
+    with torch.inference_mode(), torch.autocast(
+            device_type='cuda', dtype=torch.float16, enabled=face.is_cuda):
+        logits_AU, logits_emotion = model(face)
     logits_AU = torch.sigmoid(logits_AU)
     logits_emotion = nn.functional.softmax(logits_emotion, 1)
 
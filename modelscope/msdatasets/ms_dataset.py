@@ -313,9 +313,9 @@ class MsDataset:
             num_processes: Optional[int]: The number of processes used for multiprocess uploading.
                 This is only applicable when local_file_path is a directory, and we are uploading mutliple-files
                 insided the directory. When None provided, the number returned by os.cpu_count() is used as default.
-            chunksize: Optional[int]: The chunksize of objects to upload.
-                For very long iterables using a large value for chunksize can make the job complete much faster than
-                using the default value of 1. Available if local_file_path is a directory.
+            chunksize: Optional[int]: Deprecated and has no effect; files are
+                submitted to the upload thread pool individually. Kept for
+                backward compatibility and may be removed in future releases.
             filter_hidden_files: Optional[bool]: Whether to filter hidden files.
                 Available if local_file_path is a directory.
             upload_mode: Optional[UploadMode]: How to upload objects from local.  Default: UploadMode.OVERWRITE, upload
@@ -339,11 +339,13 @@ class MsDataset:
                 local_file_path=local_file_path,
                 upload_mode=upload_mode)
         elif os.path.isdir(local_file_path):
+            if chunksize != 1:
+                logger.warning(
+                    'The chunksize argument is deprecated and has no effect.')
             _upload_manager.upload_dir(
                 object_dir_name=object_name,
                 local_dir_path=local_file_path,
                 num_processes=num_processes,
-                chunksize=chunksize,
                 filter_hidden_files=filter_hidden_files,
                 upload_mode=upload_mode)
         else:
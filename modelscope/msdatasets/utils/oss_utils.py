@@ -38,6 +38,10 @@ class OssUtilities:
         self.num_threads = multiprocessing.cpu_count()
         self.part_size = 1 * 1024 * 1024
         self.multipart_threshold = 50 * 1024 * 1024
+        # Upload files >= 8MB as parallel 8MB parts to use the full
+        # egress bandwidth instead of a single TLS stream.
+        self.upload_part_size = 8 * 1024 * 1024
+        self.upload_multipart_threshold = 8 * 1024 * 1024
         self.max_retries = 3
 
         self.resumable_store_download = oss2.ResumableDownloadStore(
@@ -147,8 +151,8 @@ class OssUtilities:
                     object_key,
                     local_file_path,
                     store=self.resumable_store_upload,
-                    multipart_threshold=self.multipart_threshold,
-                    part_size=self.part_size,
+                    multipart_threshold=self.upload_multipart_threshold,
+                    part_size=self.upload_part_size,
                     progress_callback=progress_callback,
                     num_threads=self.num_threads)
                 break
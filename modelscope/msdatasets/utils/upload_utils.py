@@ -1,7 +1,8 @@
 # Copyright (c) Alibaba, Inc. and its affiliates.
 
 import os
-from multiprocessing.dummy import Pool as ThreadPool
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from tqdm import tqdm
 
@@ -36,8 +37,8 @@ class DatasetUploadManager(object):
         return object_key
 
     def upload_dir(self, object_dir_name: str, local_dir_path: str,
-                   num_processes: int, chunksize: int,
-                   filter_hidden_files: bool, upload_mode: UploadMode) -> int:
+                   num_processes: int, filter_hidden_files: bool,
+                   upload_mode: UploadMode) -> int:
 
         def run_upload(args):
             self.oss_utilities.upload(
@@ -46,23 +47,39 @@ class DatasetUploadManager(object):
                 indicate_individual_progress=False,
                 upload_mode=upload_mode)
 
-        files_list = []
-        for root, dirs, files in os.walk(local_dir_path):
-            for file_name in files:
-                if filter_hidden_files and file_name.startswith('.'):
-                    continue
-                # Concatenate directory name and relative path into oss object key. e.g., train/001/1_1230.png
-                object_name = os.path.join(
-                    object_dir_name,
-                    root.replace(local_dir_path, '', 1).strip('/'), file_name)
+        # Enumerate with scandir and submit uploads as entries are found,
+        # so directory scanning overlaps with network I/O instead of
+        # running as a serial prologue over the whole tree.
+        with ThreadPoolExecutor(max_workers=num_processes) as executor:
+            futures = []
+            pending_dirs = deque([local_dir_path])
+            while pending_dirs:
+                root = pending_dirs.popleft()
+                # Compute the oss key prefix once per directory; oss keys
+                # are POSIX-style regardless of the local separator.
+                if root == local_dir_path:
+                    key_prefix = object_dir_name
+                else:
+                    rel_dir = os.path.relpath(root, local_dir_path).replace(
+                        os.sep, '/')
+                    key_prefix = f'{object_dir_name}/{rel_dir}'
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                pending_dirs.append(entry.path)
+                            continue
+                        file_name = entry.name
+                        if filter_hidden_files and file_name.startswith('.'):
+                            continue
+                        # Concatenate directory name and relative path into oss object key.
+                        # e.g., train/001/1_1230.png
+                        object_name = f'{key_prefix}/{file_name}'
+                        futures.append(
+                            executor.submit(run_upload,
+                                            (object_name, entry.path)))
 
-                local_file_path = os.path.join(root, file_name)
-                files_list.append((object_name, local_file_path))
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                future.result()
 
-        with ThreadPool(processes=num_processes) as pool:
-            result = list(
-                tqdm(
-                    pool.imap(run_upload, files_list, chunksize=chunksize),
-                    total=len(files_list)))
-
-        return len(result)
+        return len(futures)